@@ -1,12 +1,15 @@
 import os
 import shutil
 import hashlib
+import functools
 import logging
 import re
 import sys
 import subprocess
+import threading
 from pathlib import Path
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 # --- Dependency Installation ---
 # This block checks for the 'inquirer' library and installs it if it's missing.
@@ -23,9 +26,13 @@ except ImportError:
         print("Please install it manually by running: pip install inquirer")
         sys.exit(1)
 
-# Import tkinter for the GUI folder dialog
-# This will be the ONLY method used for folder selection.
-from tkinter import Tk, filedialog, TclError
+# --- Optional Fast Hashing ---
+# BLAKE3 is much faster than SHA-256 and is only used to spot identical files.
+# If it isn't installed, duplicate detection falls back to hashlib's SHA-256.
+try:
+    import blake3
+except ImportError:
+    blake3 = None
 
 # --- Script Configuration ---
 logging.basicConfig(
@@ -37,6 +44,16 @@ logging.basicConfig(
     ]
 )
 
+# Record which hasher duplicate detection will use. OpenSSL selects its
+# SHA-NI code path at runtime when the CPU supports it.
+if blake3 is not None:
+    logging.debug("Hashing backend: BLAKE3")
+elif hashlib.sha256.__name__.startswith("openssl_"):
+    import ssl
+    logging.debug("Hashing backend: SHA-256 via %s", ssl.OPENSSL_VERSION)
+else:
+    logging.debug("Hashing backend: SHA-256 (built-in, no OpenSSL)")
+
 def auto_skip_script(files_to_skip: list) -> list:
     """
     Automatically adds the script's own filename to the list of files to be skipped
@@ -45,7 +62,7 @@ def auto_skip_script(files_to_skip: list) -> list:
     try:
         script_name = os.path.basename(__file__)
         if script_name not in files_to_skip:
-            logging.info(f"Automatically skipping the script itself: {script_name}")
+            logging.info("Automatically skipping the script itself: %s", script_name)
             files_to_skip.append(script_name)
     except NameError:
         # This fallback is for environments where __file__ might not be defined
@@ -55,10 +72,12 @@ def auto_skip_script(files_to_skip: list) -> list:
 def select_folder() -> Path:
     """
     Opens a GUI window using tkinter to select the folder to organize.
-    If the GUI cannot be displayed, it will exit with an error.
+    If the GUI cannot be displayed, it returns None.
     """
     print("Attempting to open the graphical folder selection dialog...")
     try:
+        # Imported here so headless runs with a folder argument never load Tk
+        from tkinter import Tk, filedialog, TclError
         root = Tk()
         root.withdraw()  # Hide the main tkinter window
         # Force the dialog to the front
@@ -71,31 +90,37 @@ def select_folder() -> Path:
 
         if folder:
             print(f"Folder selected: {folder}")
-            logging.debug(f"Selected folder: {folder}")
+            logging.debug("Selected folder: %s", folder)
             return Path(folder)
         else:
             # This block runs if the user closes the dialog window
             logging.info("No folder was selected from the dialog.")
             return None
             
+    except ImportError as e:
+        print("\n--- CRITICAL ERROR ---")
+        print("Tkinter is not installed, so the folder selection window can't be shown.")
+        print("Pass the folder to organize as an argument instead.")
+        logging.error("Tkinter could not be imported: %s", e)
+        return None
     except TclError as e:
         print("\n--- CRITICAL ERROR ---")
         print("Could not open the graphical folder selection window.")
-        print("This script requires a desktop environment to run.")
-        print("It cannot be run in a text-only terminal (like a basic SSH session).")
-        logging.error(f"Tkinter failed to initialize: {e}")
+        print("The folder selection window requires a desktop environment.")
+        print("In a text-only terminal (like a basic SSH session), pass the folder as an argument.")
+        logging.error("Tkinter failed to initialize: %s", e)
         return None
     except Exception as e:
         print(f"\nAn unexpected error occurred during folder selection: {e}")
-        logging.error(f"An unexpected error occurred in select_folder: {e}")
+        logging.error("An unexpected error occurred in select_folder: %s", e)
         return None
 
 
-def get_user_choices(base_folder: Path) -> (list, list):
+def get_user_choices(all_items: list) -> (list, list):
     """
     Asks the user which files and folders to skip using an interactive list.
+    all_items are the os.DirEntry objects of the folder being organized.
     """
-    all_items = [item for item in base_folder.iterdir()]
     files_to_consider = sorted([f.name for f in all_items if f.is_file()])
     folders_to_consider = sorted([f.name for f in all_items if f.is_dir() and not f.name.startswith('.')])
 
@@ -116,30 +141,132 @@ def get_user_choices(base_folder: Path) -> (list, list):
     return answers.get('files_to_skip', []), answers.get('folders_to_skip', [])
 
 
-def compute_hash(fp: Path, chunk_size=65536) -> str:
-    h = hashlib.sha256()
+def _scan(root: Path, skip_names=frozenset(), top_level=True):
+    """
+    Recursively walks a folder with os.scandir, yielding (path, stat, is_file)
+    for every file and folder. The stat is None for folders. Top-level folders
+    whose names are in skip_names are not entered.
+    """
+    try:
+        with os.scandir(root) as it:
+            entries = list(it)
+    except OSError as e:
+        logging.error("Could not scan directory %s: %s", root, e)
+        return
+
+    for entry in entries:
+        if top_level and entry.name in skip_names:
+            continue
+        path = Path(entry.path)
+        if entry.is_file():
+            try:
+                yield path, entry.stat(), True
+            except OSError as e:
+                logging.warning("Could not get size of file %s: %s", path, e)
+        elif entry.is_dir():
+            yield path, None, False
+            if not entry.is_symlink():
+                yield from _scan(path, skip_names, top_level=False)
+
+
+# --- Hashing Settings ---
+# Bytes read per call when hashing; 1 MiB keeps call overhead low and matches OS readahead
+HASH_CHUNK_SIZE = 1 << 20
+# Bytes hashed from the start of each file before committing to a full hash
+HEAD_HASH_SIZE = 131072
+# Parallel hashing threads. hashlib and blake3 release the GIL while hashing;
+# around 2x the core count suits NVMe drives, 1x is plenty for spinning disks.
+MAX_HASH_WORKERS = os.cpu_count() or 4
+
+# One reusable read buffer per hashing thread
+_read_buffers = threading.local()
+
+
+def _read_buffer(size: int) -> bytearray:
+    buf = getattr(_read_buffers, "buf", None)
+    if buf is None or len(buf) != size:
+        buf = _read_buffers.buf = bytearray(size)
+    return buf
+
+
+def compute_hash(fp: Path, chunk_size=HASH_CHUNK_SIZE) -> str:
     try:
+        if blake3 is not None:
+            # Memory-mapped, multithreaded hashing in the Rust implementation
+            h = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            h.update_mmap(str(fp))
+            return h.hexdigest()
         with fp.open("rb") as f:
-            while chunk := f.read(chunk_size):
-                h.update(chunk)
+            if hasattr(hashlib, "file_digest"):
+                # Python 3.11+: the read/hash loop runs in C without the GIL
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            h = hashlib.sha256()
+            buf = _read_buffer(chunk_size)
+            view = memoryview(buf)
+            while n := f.readinto(buf):
+                h.update(view[:n])
         return h.hexdigest()
     except (IOError, OSError) as e:
-        logging.error(f"Could not read file {fp} to compute hash: {e}")
+        logging.error("Could not read file %s to compute hash: %s", fp, e)
         return None
 
 
+def compute_head_hash(fp: Path, size=HEAD_HASH_SIZE) -> str:
+    try:
+        with fp.open("rb") as f:
+            head = f.read(size)
+    except (IOError, OSError) as e:
+        logging.error("Could not read file %s to compute hash: %s", fp, e)
+        return None
+    if blake3 is not None:
+        return blake3.blake3(head).hexdigest()
+    return hashlib.sha256(head).hexdigest()
+
+
+def find_identical_files(by_size: dict) -> dict:
+    """
+    Groups files with identical content, narrowing candidates by size, then
+    by a hash of their first HEAD_HASH_SIZE bytes, before hashing in full.
+    """
+    hashes = defaultdict(list)
+    candidates = [(size, item) for size, same_size in by_size.items() if len(same_size) > 1
+                  for item in same_size]
+
+    with ThreadPoolExecutor(max_workers=MAX_HASH_WORKERS) as pool:
+        by_head = defaultdict(list)
+        head_hashes = pool.map(compute_head_hash, [item for _, item in candidates])
+        for (size, item), head_hash in zip(candidates, head_hashes):
+            if head_hash:
+                by_head[(size, head_hash)].append(item)
+
+        to_hash = []
+        for (size, head_hash), same_head in by_head.items():
+            if len(same_head) < 2:
+                continue
+            if size <= HEAD_HASH_SIZE:
+                # The head hash already covered the whole file
+                hashes[head_hash].extend(same_head)
+            else:
+                to_hash.extend(same_head)
+
+        for item, file_hash in zip(to_hash, pool.map(compute_hash, to_hash)):
+            if file_hash:
+                hashes[file_hash].append(item)
+    return hashes
+
+
 def handle_duplicates(base_folder: Path) -> int:
     """
     Finds and deletes duplicate files based on their hash.
     It prioritizes keeping files without '(x)' in their name.
     """
     logging.info("Scanning for duplicate files...")
-    hashes = defaultdict(list)
-    for item in base_folder.rglob('*'):
-        if item.is_file():
-            file_hash = compute_hash(item)
-            if file_hash:
-                hashes[file_hash].append(item)
+    by_size = defaultdict(list)
+    for item, st, is_file in _scan(base_folder):
+        if is_file:
+            by_size[st.st_size].append(item)
+
+    hashes = find_identical_files(by_size)
 
     duplicates_deleted = 0
     for file_hash, file_paths in hashes.items():
@@ -152,80 +279,155 @@ def handle_duplicates(base_folder: Path) -> int:
             duplicates_to_delete = [p for p in file_paths if p not in originals]
 
             if duplicates_to_delete:
-                logging.info(f"Duplicate found for: {originals[0].name}")
+                logging.info("Duplicate found for: %s", originals[0].name)
                 for dup in duplicates_to_delete:
                     try:
                         dup.unlink()
-                        logging.info(f"  - Deleted duplicate: {dup.name}")
+                        logging.info("  - Deleted duplicate: %s", dup.name)
                         duplicates_deleted += 1
                     except OSError as e:
-                        logging.error(f"Could not delete duplicate file {dup}: {e}")
+                        logging.error("Could not delete duplicate file %s: %s", dup, e)
     
     return duplicates_deleted
 
 
 def ensure_folder_exists(folder: Path) -> None:
     folder.mkdir(parents=True, exist_ok=True)
-    logging.debug(f"Ensured folder exists: {folder}")
+    logging.debug("Ensured folder exists: %s", folder)
 
 
-def get_target_filename(src: Path) -> str:
-    if src.suffix.lower() == ".pdf":
+def get_target_filename(src: Path, ext_lower: str = None) -> str:
+    if ext_lower is None:
+        ext_lower = src.suffix.lower()
+    if ext_lower == ".pdf":
         stem, ext = os.path.splitext(src.name)
         return f"{stem.title()}{ext.lower()}"
     return src.name
 
 
-def move_and_rename_file(src: Path, dest_folder: Path) -> bool:
-    src = src.resolve()
-    dest_folder = dest_folder.resolve()
-    base = get_target_filename(src)
-    target = dest_folder / base
-    logging.debug(f"Processing file: {src} -> {target}")
-
-    if target.exists():
-        logging.debug(f"Conflict: {target} exists")
-        if compute_hash(target) == compute_hash(src):
-            logging.info(f"Duplicate of '{target.name}' found. Deleting source: {src.name}")
-            src.unlink()
+def _files_equal(a: Path, b: Path, chunk_size=1 << 20) -> bool:
+    """
+    Compares two files in 1 MiB blocks, stopping at the first difference.
+    Files of different sizes are rejected without being opened.
+    """
+    try:
+        if a.stat().st_size != b.stat().st_size:
             return False
-        
-        stem, ext = os.path.splitext(base)
-        counter = 1
-        while True:
-            candidate = dest_folder / f"{stem}_{counter}{ext}"
-            if not candidate.exists():
-                target = candidate
-                break
-            counter += 1
-    
+        with a.open("rb") as fa, b.open("rb") as fb:
+            while True:
+                chunk = fa.read(chunk_size)
+                if chunk != fb.read(chunk_size):
+                    return False
+                if not chunk:
+                    return True
+    except OSError:
+        return False
+
+
+@functools.lru_cache(maxsize=None)
+def _device_of(folder: Path) -> int:
+    return os.stat(folder).st_dev
+
+
+def _on_same_device(src: Path, dest_folder: Path) -> bool:
+    """
+    Returns True when src can be moved into dest_folder without copying data.
+    Each destination folder's device is only looked up once.
+    """
     try:
-        shutil.move(str(src), str(target))
-        logging.debug(f"Moved file to: {target}")
-        return True
-    except (shutil.Error, OSError) as e:
-        logging.error(f"Could not move file {src} to {target}: {e}")
+        return os.lstat(src).st_dev == _device_of(dest_folder)
+    except OSError:
+        return False
+
+
+def _link_into_place(src: Path, target: Path) -> bool:
+    """
+    Moves src to target by hard-linking the new name and removing the old one.
+    Unlike rename(), this never replaces a file that already has the name;
+    returns False in that case. Raises OSError if hard links aren't possible.
+    """
+    try:
+        os.link(src, target)
+    except FileExistsError:
         return False
+    try:
+        os.unlink(src)
+    except OSError:
+        os.unlink(target)
+        raise
+    return True
+
+
+def move_and_rename_file(src: Path, dest_folder: Path, ext_lower: str = None) -> bool:
+    base = get_target_filename(src, ext_lower)
+    stem, ext = os.path.splitext(base)
+    target = dest_folder / base
+    logging.debug("Processing file: %s -> %s", src, target)
+    same_device = _on_same_device(src, dest_folder)
+
+    taken = None  # Casefolded names in dest_folder, listed on the first conflict
+    counter = 0
+    while True:
+        is_taken = target.exists() if taken is None else target.name.casefold() in taken
+        if not is_taken:
+            if same_device:
+                try:
+                    if _link_into_place(src, target):
+                        logging.debug("Moved file to: %s", target)
+                        return True
+                except OSError:
+                    # No hard links on this filesystem (FAT/exFAT...)
+                    same_device = False
+            if not same_device:
+                # Across devices shutil copies with copy2, which uses os.sendfile on Linux
+                try:
+                    shutil.move(str(src), str(target))
+                    logging.debug("Moved file to: %s", target)
+                    return True
+                except (shutil.Error, OSError) as e:
+                    logging.error("Could not move file %s to %s: %s", src, target, e)
+                    return False
+            # Otherwise the name was taken after it was checked
+
+        if taken is None:
+            logging.debug("Conflict: %s exists", target)
+            # List the destination once rather than probing every candidate name.
+            # Names are casefolded so case-insensitive filesystems can't be clobbered.
+            try:
+                with os.scandir(dest_folder) as it:
+                    taken = {entry.name.casefold() for entry in it}
+            except OSError as e:
+                logging.error("Could not list folder %s: %s", dest_folder, e)
+                return False
+
+        if _files_equal(target, src):
+            logging.info("Duplicate of '%s' found. Deleting source: %s", target.name, src.name)
+            src.unlink()
+            return False
+        counter += 1
+        target = dest_folder / f"{stem}_{counter}{ext}"
 
 
 def move_folder(src: Path, dest_parent: Path) -> bool:
-    src = src.resolve()
-    dest_parent = dest_parent.resolve()
     target = dest_parent / src.name
 
     if target.exists():
-        logging.debug(f"Folder conflict: {target}")
+        logging.debug("Folder conflict: %s", target)
         counter = 1
         while (dest_parent / f"{src.name}_{counter}").exists():
             counter += 1
         target = dest_parent / f"{src.name}_{counter}"
     
     try:
-        shutil.move(str(src), str(target))
-        logging.debug(f"Moved folder to: {target}")
+        if _on_same_device(src, dest_parent):
+            os.rename(src, target)
+        else:
+            # Cross-device folder moves need shutil's copytree fallback
+            shutil.move(str(src), str(target))
+        logging.debug("Moved folder to: %s", target)
         return True
     except (shutil.Error, OSError) as e:
-        logging.error(f"Could not move folder {src} to {target}: {e}")
+        logging.error("Could not move folder %s to %s: %s", src, target, e)
         return False
 
 
@@ -235,17 +437,46 @@ def refine_sorting(base_folder: Path, summary: dict):
     refine_exts = {".json", ".tsx", ".ts", ".yaml", ".yml"}
     if others_folder.exists() and coding_folder.exists():
         for item in list(others_folder.iterdir()):
-            if item.is_file() and item.suffix.lower() in refine_exts:
-                logging.debug(f"Refining: moving {item.name} from 10 - OTHERS to 7 - CODING")
-                if move_and_rename_file(item, coding_folder):
+            if not item.is_file():
+                continue
+            ext_lower = item.suffix.lower()
+            if ext_lower in refine_exts:
+                logging.debug("Refining: moving %s from 10 - OTHERS to 7 - CODING", item.name)
+                if move_and_rename_file(item, coding_folder, ext_lower):
                     summary['files_moved'] += 1
 
 
+# Notebooks saved with an extra suffix (e.g. "analysis.ipynb.txt") still go to CODING
+IPYNB_PATTERN = re.compile(r"ipynb", re.IGNORECASE)
+
+
+def classify_files(names: list, ext_to_folder: dict, default: Path) -> list:
+    """
+    Picks the destination folder for every filename in one pass, before any
+    file is touched, so the move loop only has filesystem work left to do.
+    Returns (destination, lowercased suffix) pairs.
+    """
+    destinations = []
+    for name in names:
+        # Same rule as Path.suffix, without building a Path per name
+        dot = name.rfind(".")
+        ext_lower = name[dot:].lower() if 0 < dot < len(name) - 1 else ""
+        category_ext = ".ipynb" if IPYNB_PATTERN.search(name) else ext_lower
+        destinations.append((ext_to_folder.get(category_ext, default), ext_lower))
+    return destinations
+
+
 def main():
-    base_folder = select_folder()
+    # A folder given on the command line skips the GUI dialog (headless, cron)
+    if len(sys.argv) > 1 and Path(sys.argv[1]).is_dir():
+        base_folder = Path(sys.argv[1])
+    else:
+        base_folder = select_folder()
     if not base_folder:
         print("No folder selected or GUI failed to open. Exiting.")
         return
+    # Resolve once here; every path built from it below is already absolute
+    base_folder = base_folder.resolve()
 
     summary = {
         'files_moved': 0,
@@ -272,7 +503,10 @@ def main():
         summary['duplicates_deleted'] = handle_duplicates(base_folder)
 
     if 'Organize' in action_choice or 'Both' in action_choice:
-        files_to_skip, folders_to_skip = get_user_choices(base_folder)
+        # List the folder once; the skip prompt and both move passes share it
+        with os.scandir(base_folder) as it:
+            entries = list(it)
+        files_to_skip, folders_to_skip = get_user_choices(entries)
         
         # --- IMPLEMENTATION OF THE NEW FUNCTION ---
         # This line automatically adds the script to the skip list.
@@ -298,32 +532,32 @@ def main():
             ensure_folder_exists(base_folder / folder_name)
         defined_categories = set(folders.keys())
 
-        for item in list(base_folder.iterdir()):
-            if item.name in files_to_skip or item.name in folders_to_skip:
-                continue
-
-            if item.is_file():
-                ext_lower = item.suffix.lower()
-                if "ipynb" in item.name.lower() and ext_lower != ".ipynb":
-                    ext_lower = ".ipynb"
-                
-                destination = None
-                for folder_name, exts in folders.items():
-                    if exts and ext_lower in {ext.lower() for ext in exts}:
-                        destination = base_folder / folder_name
-                        break
-                if not destination:
-                    destination = base_folder / "10 - OTHERS"
-                
-                if move_and_rename_file(item, destination):
-                    summary['files_moved'] += 1
+        # One lookup per file; the first category listing an extension wins
+        ext_to_folder = {}
+        for folder_name, exts in folders.items():
+            for ext in exts:
+                ext_to_folder.setdefault(ext.lower(), base_folder / folder_name)
+        others_folder = base_folder / "10 - OTHERS"
 
-        for item in list(base_folder.iterdir()):
-            if item.is_dir() and item.name not in defined_categories and item.name not in folders_to_skip:
-                dest = base_folder / "6 - FOLDERS"
-                ensure_folder_exists(dest)
-                if move_folder(item, dest):
-                    summary['folders_moved'] += 1
+        files, nested_dirs = [], []
+        for entry in entries:
+            if entry.name in files_to_skip or entry.name in folders_to_skip:
+                continue
+            if entry.is_file():
+                files.append(Path(entry.path))
+            elif entry.is_dir() and entry.name not in defined_categories:
+                nested_dirs.append(Path(entry.path))
+
+        destinations = classify_files([item.name for item in files], ext_to_folder, others_folder)
+        for item, (destination, ext_lower) in zip(files, destinations):
+            if move_and_rename_file(item, destination, ext_lower):
+                summary['files_moved'] += 1
+
+        for item in nested_dirs:
+            dest = base_folder / "6 - FOLDERS"
+            ensure_folder_exists(dest)
+            if move_folder(item, dest):
+                summary['folders_moved'] += 1
         
         refine_sorting(base_folder, summary)
 